@@ -0,0 +1,90 @@
+import asyncio
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Set
+
+from .models import ActivePlayer
+
+# Frames buffered per viewer before the oldest ones are dropped.
+SUBSCRIBER_QUEUE_SIZE = 4
+
+
+class Subscription:
+    """A single viewer's bounded frame queue."""
+
+    def __init__(self, player_id: str, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.player_id = player_id
+        # A None frame tells the viewer the player is gone
+        self.queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, frame: Optional[bytes]):
+        if self.closed:
+            return
+        # Never block the producer: if the viewer is behind, drop the oldest
+        # frame so the queue converges on the latest state.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+
+    def close(self):
+        # Queued frames (e.g. a final game-over frame) are still delivered first
+        self.offer(None)
+        self.closed = True
+
+    async def get(self) -> Optional[bytes]:
+        return await self.queue.get()
+
+
+class BroadcastHub:
+    """Fans out active player state to spectators.
+
+    Each published state is serialized once and the same bytes object is
+    handed to every subscriber of that player.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._latest: Dict[str, bytes] = {}
+
+    def publish(self, player: ActivePlayer) -> bytes:
+        frame = player.model_dump_json().encode()
+        self._latest[player.id] = frame
+        for subscription in self._subscribers.get(player.id, ()):
+            subscription.offer(frame)
+        return frame
+
+    def latest(self, player_id: str) -> Optional[bytes]:
+        return self._latest.get(player_id)
+
+    def remove_player(self, player_id: str):
+        self._latest.pop(player_id, None)
+        for subscription in self._subscribers.pop(player_id, ()):
+            subscription.close()
+
+    @contextmanager
+    def subscribe(self, player_id: str) -> Iterator[Subscription]:
+        subscription = Subscription(player_id, self.queue_size)
+        frame = self._latest.get(player_id)
+        if frame is not None:
+            subscription.offer(frame)
+        self._subscribers.setdefault(player_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscribers.get(player_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[player_id]
+
+    def viewer_count(self, player_id: str) -> int:
+        return len(self._subscribers.get(player_id, ()))
+
+    def viewer_counts(self) -> Dict[str, int]:
+        return {player_id: len(subs) for player_id, subs in self._subscribers.items()}
+
+
+hub = BroadcastHub()
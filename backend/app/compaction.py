@@ -0,0 +1,179 @@
+import asyncio
+import json
+import logging
+import os
+import zlib
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import select, delete, desc, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import AsyncSessionLocal, advisory_lock, engine
+from .models import LeaderboardEntry, LeaderboardArchive
+
+logger = logging.getLogger(__name__)
+
+# Retention policy: each user keeps their best N entries per mode, plus
+# everything submitted inside the recent window. The rest is archived.
+LEADERBOARD_KEEP_BEST = int(os.getenv("LEADERBOARD_KEEP_BEST", "10"))
+LEADERBOARD_RECENT_DAYS = int(os.getenv("LEADERBOARD_RECENT_DAYS", "30"))
+LEADERBOARD_COMPACTION_BATCH = int(os.getenv("LEADERBOARD_COMPACTION_BATCH", "500"))
+# Users ranked together per query.
+LEADERBOARD_COMPACTION_USERS_PER_PAGE = int(os.getenv("LEADERBOARD_COMPACTION_USERS_PER_PAGE", "100"))
+# Seconds to wait between batches within a run.
+LEADERBOARD_COMPACTION_PAUSE = float(os.getenv("LEADERBOARD_COMPACTION_PAUSE", "0.5"))
+# Seconds between runs; 0 disables the background job.
+LEADERBOARD_COMPACTION_INTERVAL = int(os.getenv("LEADERBOARD_COMPACTION_INTERVAL", "3600"))
+
+COMPACTION_LOCK_KEY = 0x6C62636D  # "lbcm"
+
+
+def compress_entries(entries: List[LeaderboardEntry]) -> bytes:
+    rows = [
+        {
+            "id": entry.id,
+            "username": entry.username,
+            "score": entry.score,
+            "mode": entry.mode.value,
+            "date": entry.date.isoformat(),
+        }
+        for entry in entries
+    ]
+    return zlib.compress(json.dumps(rows, separators=(",", ":")).encode())
+
+
+def decompress_entries(archive: LeaderboardArchive) -> List[dict]:
+    return json.loads(zlib.decompress(archive.payload))
+
+
+async def next_username_page(session: AsyncSession, after: Optional[str], page_size: int) -> List[str]:
+    # Keyset pagination over users, served by the username index
+    query = select(LeaderboardEntry.username).distinct().order_by(LeaderboardEntry.username).limit(page_size)
+    if after is not None:
+        query = query.where(LeaderboardEntry.username > after)
+    usernames = (await session.execute(query)).scalars().all()
+    await session.commit()
+    return list(usernames)
+
+
+async def find_candidates(
+    session: AsyncSession,
+    usernames: List[str],
+    keep_best: int,
+    cutoff: datetime,
+    limit: int,
+) -> List[str]:
+    # Rank each user's entries per mode; anything past their best N that is
+    # also older than the cutoff is eligible for archiving. Only the given
+    # users are ranked, so each query touches a bounded slice of the table.
+    ranked = (
+        select(
+            LeaderboardEntry.id,
+            LeaderboardEntry.date,
+            func.row_number()
+            .over(
+                partition_by=(LeaderboardEntry.username, LeaderboardEntry.mode),
+                order_by=(desc(LeaderboardEntry.score), desc(LeaderboardEntry.date)),
+            )
+            .label("position"),
+        )
+        .where(LeaderboardEntry.username.in_(usernames))
+        .subquery()
+    )
+    candidates = (
+        select(ranked.c.id)
+        .where(ranked.c.position > keep_best, ranked.c.date < cutoff)
+        .order_by(ranked.c.id)
+        .limit(limit)
+    )
+    ids = (await session.execute(candidates)).scalars().all()
+    # End the read transaction before the write batch starts
+    await session.commit()
+    return list(ids)
+
+
+async def archive_batch(session: AsyncSession, ids: List[str]) -> int:
+    # DELETE ... RETURNING archives exactly the rows this transaction removed,
+    # so a concurrent run can never archive the same entry twice.
+    result = await session.execute(
+        delete(LeaderboardEntry)
+        .where(LeaderboardEntry.id.in_(ids))
+        .returning(
+            LeaderboardEntry.id,
+            LeaderboardEntry.username,
+            LeaderboardEntry.score,
+            LeaderboardEntry.mode,
+            LeaderboardEntry.date,
+        )
+    )
+    entries = result.all()
+
+    by_mode = {}
+    for entry in entries:
+        by_mode.setdefault(entry.mode, []).append(entry)
+
+    # Archive and delete in the same transaction: a reader sees each entry
+    # either live or archived, never both or neither. Entries ranked below an
+    # archived one move up by one in the global leaderboard; a user's best N
+    # per mode are never archived.
+    for mode, mode_entries in by_mode.items():
+        session.add(
+            LeaderboardArchive(
+                mode=mode,
+                entryCount=len(mode_entries),
+                payload=compress_entries(mode_entries),
+                archivedAt=datetime.utcnow(),
+            )
+        )
+    await session.commit()
+    return len(entries)
+
+
+async def compact_leaderboard(
+    session: AsyncSession,
+    keep_best: int = LEADERBOARD_KEEP_BEST,
+    recent_days: int = LEADERBOARD_RECENT_DAYS,
+    batch_size: int = LEADERBOARD_COMPACTION_BATCH,
+    pause: float = LEADERBOARD_COMPACTION_PAUSE,
+    users_per_page: int = LEADERBOARD_COMPACTION_USERS_PER_PAGE,
+) -> int:
+    # Entry dates are stored in UTC (see LeaderboardEntry.date)
+    cutoff = datetime.utcnow() - timedelta(days=recent_days)
+    total = 0
+    last_username = None
+    while True:
+        usernames = await next_username_page(session, last_username, users_per_page)
+        if not usernames:
+            return total
+        last_username = usernames[-1]
+
+        # Archive this page of users a batch at a time. Each batch re-ranks
+        # only these users, so memory and transactions stay small.
+        while True:
+            ids = await find_candidates(session, usernames, keep_best, cutoff, batch_size)
+            if ids:
+                total += await archive_batch(session, ids)
+            if len(ids) < batch_size:
+                break
+            # Give foreground writers room between short write transactions
+            await asyncio.sleep(pause)
+        await asyncio.sleep(pause)
+
+
+async def run_compaction_loop(interval: int = LEADERBOARD_COMPACTION_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            # Every worker runs this loop; only the lock holder compacts.
+            async with advisory_lock(engine, COMPACTION_LOCK_KEY, wait=False) as acquired:
+                if not acquired:
+                    continue
+                async with AsyncSessionLocal() as session:
+                    archived = await compact_leaderboard(session)
+            if archived:
+                logger.info("Archived %d leaderboard entries", archived)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Leaderboard compaction failed")
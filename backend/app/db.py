@@ -1,7 +1,9 @@
 import os
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 # Default to SQLite for local development
@@ -38,3 +40,25 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+# Cross-process lock for background jobs and migrations. Postgres uses an
+# advisory lock; SQLite is single-host and serializes writers itself, so the
+# lock is a no-op there.
+@asynccontextmanager
+async def advisory_lock(db_engine: AsyncEngine, key: int, wait: bool = True) -> AsyncGenerator[bool, None]:
+    if db_engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    async with db_engine.connect() as conn:
+        if wait:
+            await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+            acquired = True
+        else:
+            result = await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})
+            acquired = bool(result.scalar())
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
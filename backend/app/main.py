@@ -1,19 +1,30 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 import os
 from .routers import auth, leaderboard, players
-from .db import engine, Base
+from .db import engine
+from .migrations import run_migrations, SCHEMA_MIGRATIONS
+from .compaction import run_compaction_loop, LEADERBOARD_COMPACTION_INTERVAL
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Create tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Startup: Apply pending schema migrations unless they were run ahead of time
+    if SCHEMA_MIGRATIONS != "skip":
+        await run_migrations(engine)
+    # Background leaderboard compaction
+    compaction_task = None
+    if LEADERBOARD_COMPACTION_INTERVAL > 0:
+        compaction_task = asyncio.create_task(run_compaction_loop())
     yield
-    # Shutdown: Close engine
+    # Shutdown: Stop compaction, then close engine
+    if compaction_task:
+        compaction_task.cancel()
+        try:
+            await compaction_task
+        except asyncio.CancelledError:
+            pass
     await engine.dispose()
 
 app = FastAPI(
@@ -42,6 +53,10 @@ app.include_router(players.router, prefix="/api")
 STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
 
 if os.path.exists(STATIC_DIR):
+    # Only needed when serving the SPA, so keep them off the API-only import path
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.responses import FileResponse
+
     # Mount assets if they exist (Vite puts them in /assets)
     assets_path = os.path.join(STATIC_DIR, "assets")
     if os.path.exists(assets_path):
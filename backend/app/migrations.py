@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    Index,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .db import advisory_lock, engine
+
+logger = logging.getLogger(__name__)
+
+# "auto" applies pending migrations during startup; "skip" assumes they were
+# already run ahead of time (`python -m app.migrations`) and touches no schema.
+SCHEMA_MIGRATIONS = os.getenv("SCHEMA_MIGRATIONS", "auto")
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String),
+    Column("appliedAt", DateTime),
+)
+
+
+# Each step declares the schema exactly as it was at that version, so a
+# migration means the same thing no matter how models.py changes later.
+
+def _create_core_tables(conn):
+    metadata = MetaData()
+    Table(
+        "users",
+        metadata,
+        Column("id", String, primary_key=True),
+        Column("username", String, index=True),
+        Column("email", String, unique=True, index=True),
+        Column("password", String),
+        Column("highScore", Integer),
+        Column("createdAt", DateTime),
+    )
+    Table(
+        "leaderboard",
+        metadata,
+        Column("id", String, primary_key=True),
+        Column("username", String, index=True),
+        Column("score", Integer),
+        Column("mode", Enum("pass_through", "walls", name="gamemode")),
+        Column("date", DateTime),
+    )
+    # checkfirst keeps this safe on databases created by the old create_all startup
+    metadata.create_all(conn, checkfirst=True)
+
+
+def _create_leaderboard_archive(conn):
+    metadata = MetaData()
+    Table(
+        "leaderboard_archive",
+        metadata,
+        Column("id", String, primary_key=True),
+        Column("mode", Enum("pass_through", "walls", name="gamemode")),
+        Column("entryCount", Integer),
+        Column("payload", LargeBinary),
+        Column("archivedAt", DateTime),
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+def _create_leaderboard_ranking_index(conn):
+    leaderboard = Table(
+        "leaderboard",
+        MetaData(),
+        Column("username", String),
+        Column("mode", String),
+        Column("score", Integer),
+    )
+    index = Index("ix_leaderboard_username_mode_score", leaderboard.c.username, leaderboard.c.mode, leaderboard.c.score)
+    index.create(conn, checkfirst=True)
+
+
+# Append only: never edit or reorder a migration once it has shipped.
+MIGRATIONS = [
+    (1, "users and leaderboard tables", _create_core_tables),
+    (2, "leaderboard archive table", _create_leaderboard_archive),
+    (3, "leaderboard (username, mode, score) index", _create_leaderboard_ranking_index),
+]
+
+MIGRATION_LOCK_KEY = 0x6D696772  # "migr"
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+async def current_version(db_engine: AsyncEngine) -> int:
+    async with db_engine.begin() as conn:
+        await conn.run_sync(schema_version.create, checkfirst=True)
+        result = await conn.execute(select(func.max(schema_version.c.version)))
+        return result.scalar() or 0
+
+
+async def run_migrations(db_engine: AsyncEngine = engine) -> int:
+    # Workers starting together queue up here on Postgres; the rest then see
+    # the new version and have nothing to do.
+    async with advisory_lock(db_engine, MIGRATION_LOCK_KEY):
+        version = await current_version(db_engine)
+        applied = 0
+        for number, description, step in MIGRATIONS:
+            if number <= version:
+                continue
+            # Each migration and its version row commit together
+            try:
+                async with db_engine.begin() as conn:
+                    await conn.run_sync(step)
+                    await conn.execute(
+                        insert(schema_version).values(
+                            version=number, description=description, appliedAt=datetime.utcnow()
+                        )
+                    )
+            except IntegrityError:
+                # Another process recorded this version first (no advisory lock
+                # on SQLite); pick up from wherever it got to.
+                version = await current_version(db_engine)
+                continue
+            logger.info("Applied migration %d: %s", number, description)
+            applied += 1
+        return applied
+
+
+def main():
+    async def _run():
+        try:
+            applied = await run_migrations(engine)
+            print(f"Applied {applied} migration(s); schema at version {LATEST_VERSION}")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ from typing import List, Optional
 import uuid
 
 from pydantic import BaseModel, EmailStr, Field
-from sqlalchemy import String, Integer, DateTime, Enum as SAEnum
+from sqlalchemy import String, Integer, DateTime, LargeBinary, Index, Enum as SAEnum
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .db import Base
@@ -100,9 +100,21 @@ class User(Base):
 
 class LeaderboardEntry(Base):
     __tablename__ = "leaderboard"
+    # Serves the per-user, per-mode ranking used by leaderboard compaction
+    __table_args__ = (Index("ix_leaderboard_username_mode_score", "username", "mode", "score"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     username: Mapped[str] = mapped_column(String, index=True) # Intentionally not FK for simplicity/history, or could be FK.
     score: Mapped[int] = mapped_column(Integer)
     mode: Mapped[GameMode] = mapped_column(SAEnum(GameMode))
     date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+class LeaderboardArchive(Base):
+    __tablename__ = "leaderboard_archive"
+
+    # One row per compaction batch; `payload` is zlib-compressed JSON of the archived entries.
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    mode: Mapped[GameMode] = mapped_column(SAEnum(GameMode))
+    entryCount: Mapped[int] = mapped_column(Integer)
+    payload: Mapped[bytes] = mapped_column(LargeBinary)
+    archivedAt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,160 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+# Token bucket settings: `burst` requests at once, refilled at `rate` per second.
+SCORE_RATE = float(os.getenv("RATE_LIMIT_SCORE_PER_SEC", "0.5"))
+SCORE_BURST = int(os.getenv("RATE_LIMIT_SCORE_BURST", "10"))
+AUTH_RATE = float(os.getenv("RATE_LIMIT_AUTH_PER_SEC", "0.2"))
+AUTH_BURST = int(os.getenv("RATE_LIMIT_AUTH_BURST", "5"))
+# Spectator frames are published at game speed, so this one is much looser.
+PUBLISH_RATE = float(os.getenv("RATE_LIMIT_PUBLISH_PER_SEC", "20"))
+PUBLISH_BURST = int(os.getenv("RATE_LIMIT_PUBLISH_BURST", "40"))
+# Buckets untouched for this many seconds are evicted.
+RATE_LIMIT_IDLE_SECONDS = float(os.getenv("RATE_LIMIT_IDLE_SECONDS", "600"))
+
+# Keep in-flight DB work below the connection pool size (SQLAlchemy default: 5 + 10 overflow).
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "15"))
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", "50"))
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("QUEUE_TIMEOUT_SECONDS", "2"))
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """Per-key token buckets with idle-key eviction.
+
+    Buckets are kept in least-recently-used order, so evicting idle keys
+    only ever looks at the front of the dict.
+    """
+
+    def __init__(self, rate: float, burst: int, idle_seconds: float = RATE_LIMIT_IDLE_SECONDS):
+        self.rate = rate
+        self.burst = burst
+        self.idle_seconds = idle_seconds
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def _evict_idle(self, now: float):
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if now - bucket.updated < self.idle_seconds:
+                break
+            del self._buckets[key]
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """Take one token for `key`. Returns 0 if allowed, else seconds until retry."""
+        now = time.monotonic() if now is None else now
+        self._evict_idle(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.burst, now)
+            self._buckets[key] = bucket
+        else:
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+            self._buckets.move_to_end(key)
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0.0
+        return (1 - bucket.tokens) / self.rate
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def reset(self):
+        self._buckets.clear()
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests and sheds load once the wait queue is full."""
+
+    def __init__(
+        self,
+        limit: int = MAX_CONCURRENT_REQUESTS,
+        max_queued: int = MAX_QUEUED_REQUESTS,
+        timeout: float = QUEUE_TIMEOUT_SECONDS,
+    ):
+        self.limit = limit
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self._queued = 0
+
+    async def acquire(self) -> bool:
+        if self._semaphore.locked() and self._queued >= self.max_queued:
+            return False
+        self._queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._queued -= 1
+
+    def release(self):
+        self._semaphore.release()
+
+
+score_limiter = RateLimiter(SCORE_RATE, SCORE_BURST)
+auth_limiter = RateLimiter(AUTH_RATE, AUTH_BURST)
+publish_limiter = RateLimiter(PUBLISH_RATE, PUBLISH_BURST)
+concurrency_limiter = ConcurrencyLimiter()
+
+
+def reset_rate_limits():
+    global concurrency_limiter
+    score_limiter.reset()
+    auth_limiter.reset()
+    publish_limiter.reset()
+    # Its semaphore binds to the first event loop that waits on it
+    concurrency_limiter = ConcurrencyLimiter()
+
+
+def check_rate_limit(limiter: RateLimiter, key: str):
+    retry_after = limiter.acquire(key)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+
+
+def client_ip(request: Request) -> str:
+    # X-Forwarded-For is applied by uvicorn's proxy headers middleware, and
+    # only for peers listed in FORWARDED_ALLOW_IPS; never read it here.
+    return request.client.host if request.client else "unknown"
+
+
+# --- Dependencies ---
+
+async def limit_auth(request: Request):
+    check_rate_limit(auth_limiter, f"ip:{client_ip(request)}")
+
+
+async def limit_concurrency():
+    # Release on the same limiter even if it is replaced mid-request
+    limiter = concurrency_limiter
+    if not await limiter.acquire():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        limiter.release()
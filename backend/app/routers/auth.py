@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
@@ -7,9 +7,10 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
+from ..ratelimit import limit_auth, limit_concurrency
 from ..models import AuthCredentials, User, UserCreate, UserRead, ApiResponse
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], dependencies=[Depends(limit_concurrency)])
 
 SECRET_KEY = "mock-secret-key"
 ALGORITHM = "HS256"
@@ -24,6 +25,16 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def decode_token(token: str) -> Optional[dict]:
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
+        return None
+
+def decode_token_subject(token: str) -> Optional[str]:
+    payload = decode_token(token)
+    return payload.get("sub") if payload else None
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     session: AsyncSession = Depends(get_db)
@@ -33,12 +44,8 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except jwt.PyJWTError:
+    email = decode_token_subject(token)
+    if email is None:
         raise credentials_exception
     
     result = await session.execute(select(User).where(User.email == email))
@@ -48,7 +55,7 @@ async def get_current_user(
         raise credentials_exception
     return user
 
-@router.post("/signup", status_code=status.HTTP_201_CREATED, response_model=ApiResponse)
+@router.post("/signup", status_code=status.HTTP_201_CREATED, response_model=ApiResponse, dependencies=[Depends(limit_auth)])
 async def signup(credentials: AuthCredentials, session: AsyncSession = Depends(get_db)):
     # Check if user exists
     result = await session.execute(select(User).where(User.email == credentials.email))
@@ -83,7 +90,7 @@ async def signup(credentials: AuthCredentials, session: AsyncSession = Depends(g
         "data": UserRead.model_validate(new_user)
     }
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(limit_auth)])
 async def login(credentials: AuthCredentials, session: AsyncSession = Depends(get_db)):
     result = await session.execute(select(User).where(User.email == credentials.email))
     user = result.scalar_one_or_none()
@@ -91,7 +98,8 @@ async def login(credentials: AuthCredentials, session: AsyncSession = Depends(ge
     if not user or user.password != credentials.password:
         return {"success": False, "error": "Invalid credentials"}
     
-    access_token = create_access_token(data={"sub": user.email})
+    # username lets hot paths (spectator frames) authorize without a user lookup
+    access_token = create_access_token(data={"sub": user.email, "username": user.username})
     
     # We construct the response. UserRead handles excluding password.
     return {
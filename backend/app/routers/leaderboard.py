@@ -5,10 +5,11 @@ from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
+from ..ratelimit import check_rate_limit, limit_concurrency, score_limiter
 from ..models import LeaderboardEntry, LeaderboardEntryRead, LeaderboardSubmission, GameMode, User, ApiResponse
 from .auth import get_current_user
 
-router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
+router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"], dependencies=[Depends(limit_concurrency)])
 
 @router.get("", response_model=ApiResponse)
 async def get_leaderboard(
@@ -46,6 +47,9 @@ async def submit_score(
     current_user: Annotated[User, Depends(get_current_user)],
     session: AsyncSession = Depends(get_db)
 ):
+    # Per-user token bucket, so one looping client can't flood the table
+    check_rate_limit(score_limiter, f"user:{current_user.id}")
+
     # Update high score if applicable
     # current_user is already attached to session from get_current_user? 
     # Actually get_current_user fetches user from DB, so it's fresh. 
@@ -65,7 +69,7 @@ async def submit_score(
         username=current_user.username,
         score=submission.score,
         mode=submission.mode,
-        date=datetime.now()
+        date=datetime.utcnow()
     )
     
     session.add(new_entry)
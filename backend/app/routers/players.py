@@ -1,20 +1,141 @@
-from typing import List, Optional
-from fastapi import APIRouter
-from ..models import ActivePlayer
+import anyio
+import os
+import time
+from typing import Annotated, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from ..broadcast import hub
+from ..models import ActivePlayer, GameStatus, User
+from ..ratelimit import check_rate_limit, limit_concurrency, publish_limiter
+from .auth import decode_token, get_current_user, oauth2_scheme
 
 # In-memory storage for active players (transient state)
 # In a production app with multiple workers, this should be Redis.
 active_players: List[ActivePlayer] = []
+# Monotonic time of each player's last update, used to expire abandoned games
+last_seen: Dict[str, float] = {}
+
+# Players with no update for this long are dropped
+ACTIVE_PLAYER_TTL_SECONDS = float(os.getenv("ACTIVE_PLAYER_TTL_SECONDS", "60"))
+
+def remove_active_player(id: str):
+    active_players[:] = [p for p in active_players if p.id != id]
+    last_seen.pop(id, None)
+    hub.remove_player(id)
+
+def prune_stale_players(now: Optional[float] = None):
+    now = time.monotonic() if now is None else now
+    for id, seen in list(last_seen.items()):
+        if now - seen > ACTIVE_PLAYER_TTL_SECONDS:
+            remove_active_player(id)
 
 router = APIRouter(prefix="/active-players", tags=["Active Players"])
 
+async def get_publisher(token: Annotated[str, Depends(oauth2_scheme)]) -> str:
+    # Frames arrive at game speed, so they are authorized from the signed token
+    # alone: no user lookup, and no slot in the DB concurrency pool.
+    payload = decode_token(token)
+    if not payload or not payload.get("sub") or not payload.get("username"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    check_rate_limit(publish_limiter, f"user:{payload['sub']}")
+    return payload["username"]
+
 @router.get("")
 async def get_all_active_players():
+    prune_stale_players()
     return {"success": True, "data": active_players}
 
+@router.get("/viewers")
+async def get_viewer_counts():
+    return {"success": True, "data": hub.viewer_counts()}
+
 @router.get("/{id}")
 async def get_active_player(id: str):
+    prune_stale_players()
     player = next((p for p in active_players if p.id == id), None)
     if not player:
-        return {"success": True, "data": None} 
+        return {"success": True, "data": None}
     return {"success": True, "data": player}
+
+@router.get("/{id}/viewers")
+async def get_player_viewers(id: str):
+    return {"success": True, "data": {"id": id, "viewers": hub.viewer_count(id)}}
+
+@router.put("/{id}")
+async def update_active_player(
+    id: str,
+    player: ActivePlayer,
+    username: Annotated[str, Depends(get_publisher)]
+):
+    if player.id != id or player.username != username:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot update another player")
+
+    prune_stale_players()
+    existing = next((p for p in active_players if p.id == id), None)
+    if existing is not None and existing.username != username:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot update another player")
+
+    # One active game per user: starting a new one replaces the old one
+    for other in [p for p in active_players if p.username == username and p.id != id]:
+        remove_active_player(other.id)
+
+    # Serialized once here, shared by every spectator
+    hub.publish(player)
+
+    if player.status == GameStatus.game_over:
+        # Spectators already have the final frame; stop tracking the game
+        remove_active_player(id)
+        return {"success": True, "data": player}
+
+    if existing is None:
+        active_players.append(player)
+    else:
+        active_players[active_players.index(existing)] = player
+    last_seen[id] = time.monotonic()
+    return {"success": True, "data": player}
+
+@router.delete("/{id}", dependencies=[Depends(limit_concurrency)])
+async def delete_active_player(
+    id: str,
+    current_user: Annotated[User, Depends(get_current_user)]
+):
+    existing = next((p for p in active_players if p.id == id), None)
+    if existing is None:
+        return {"success": True, "data": None}
+    if existing.username != current_user.username:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot remove another player")
+    remove_active_player(id)
+    return {"success": True, "data": None}
+
+@router.websocket("/{id}/watch")
+async def watch_active_player(websocket: WebSocket, id: str):
+    await websocket.accept()
+    with hub.subscribe(id) as subscription:
+        async with anyio.create_task_group() as tg:
+            async def send_frames():
+                try:
+                    while True:
+                        frame = await subscription.get()
+                        if frame is None:
+                            # Player was removed; nothing more will arrive
+                            await websocket.close()
+                            tg.cancel_scope.cancel()
+                            return
+                        await websocket.send_bytes(frame)
+                except (WebSocketDisconnect, RuntimeError):
+                    # Client went away mid-send
+                    tg.cancel_scope.cancel()
+
+            async def wait_for_disconnect():
+                # Spectators don't send anything; this returns once they leave.
+                while True:
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        tg.cancel_scope.cancel()
+                        return
+
+            tg.start_soon(send_frames)
+            tg.start_soon(wait_for_disconnect)
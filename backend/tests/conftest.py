@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, Asyn
 
 from app.main import app
 from app.db import Base, get_db
+from app.ratelimit import reset_rate_limits
 
 TEST_DB = "sqlite+aiosqlite:///./test_api.db"
 
@@ -42,6 +43,7 @@ async def client(db_session):
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    reset_rate_limits()
     
     # Use AsyncClient
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
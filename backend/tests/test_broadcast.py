@@ -0,0 +1,149 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.broadcast import BroadcastHub, hub
+from app.main import app
+from app.models import ActivePlayer, GameStatus
+from app.routers import players
+
+def make_player(score=0, player_id="p1", username="Streamer"):
+    return ActivePlayer(
+        id=player_id,
+        username=username,
+        score=score,
+        mode="walls",
+        snake=[{"x": 1, "y": 1}],
+        food={"x": 5, "y": 5},
+        direction="RIGHT",
+        status="playing",
+    )
+
+@pytest.mark.asyncio
+async def test_hub_shares_frames_and_drops_for_slow_viewers():
+    broadcast = BroadcastHub(queue_size=2)
+    with broadcast.subscribe("p1") as fast, broadcast.subscribe("p1") as slow:
+        assert broadcast.viewer_count("p1") == 2
+
+        frame = broadcast.publish(make_player(score=10))
+        assert await fast.get() is frame
+
+        # The slow viewer never reads; its queue stays bounded at the latest frames
+        for score in range(20, 60, 10):
+            broadcast.publish(make_player(score=score))
+        assert slow.queue.qsize() == 2
+        assert slow.dropped == 3
+        await slow.get()
+        latest = await slow.get()
+        assert b'"score":50' in latest
+
+    assert broadcast.viewer_count("p1") == 0
+    assert broadcast.viewer_counts() == {}
+
+@pytest.mark.asyncio
+async def test_removing_player_closes_subscriptions():
+    broadcast = BroadcastHub()
+    with broadcast.subscribe("p1") as viewer:
+        final = broadcast.publish(make_player(score=90))
+        broadcast.remove_player("p1")
+        # The final frame is still delivered, then the close marker
+        assert await viewer.get() is final
+        assert await viewer.get() is None
+        assert broadcast.viewer_count("p1") == 0
+        # Later publishes under the same id don't reach the closed viewer
+        broadcast.publish(make_player(score=100))
+        assert viewer.queue.empty()
+
+@pytest.mark.asyncio
+async def test_viewer_counts_endpoint(client):
+    with hub.subscribe("p-viewers"):
+        response = await client.get("/api/active-players/p-viewers/viewers")
+        assert response.json()["data"] == {"id": "p-viewers", "viewers": 1}
+
+        response = await client.get("/api/active-players/viewers")
+        assert response.json()["data"]["p-viewers"] == 1
+
+    response = await client.get("/api/active-players/p-viewers/viewers")
+    assert response.json()["data"]["viewers"] == 0
+
+@pytest.fixture
+def clean_players():
+    yield
+    # Module-level state is shared across tests; always reset it, even on failure
+    for player_id in list(players.last_seen) + [p.id for p in players.active_players]:
+        players.remove_active_player(player_id)
+    hub.remove_player("ws-player")
+
+async def login(client, email="streamer@test.com", username="Streamer"):
+    await client.post("/api/auth/signup", json={"email": email, "username": username, "password": "pw"})
+    login_res = await client.post("/api/auth/login", json={"email": email, "password": "pw"})
+    return {"Authorization": f"Bearer {login_res.json()['token']}"}
+
+@pytest.mark.asyncio
+async def test_publish_player_state(client, clean_players):
+    headers = await login(client)
+
+    player = make_player(score=30, player_id="stream-1")
+    response = await client.put("/api/active-players/stream-1", json=player.model_dump(mode="json"), headers=headers)
+    assert response.status_code == 200
+    assert hub.latest("stream-1") == player.model_dump_json().encode()
+
+    response = await client.get("/api/active-players/stream-1")
+    assert response.json()["data"]["score"] == 30
+
+    # Cannot publish as someone else
+    other = make_player(player_id="stream-2", username="Someone")
+    response = await client.put("/api/active-players/stream-2", json=other.model_dump(mode="json"), headers=headers)
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_active_players_are_removed(client, clean_players):
+    headers = await login(client)
+
+    # Starting a new game replaces the user's previous one
+    for player_id in ("game-1", "game-2"):
+        player = make_player(player_id=player_id)
+        await client.put(f"/api/active-players/{player_id}", json=player.model_dump(mode="json"), headers=headers)
+    assert [p.id for p in players.active_players] == ["game-2"]
+    assert hub.latest("game-1") is None
+
+    # Game over drops the player after the final frame is published
+    finished = make_player(player_id="game-2").model_copy(update={"status": GameStatus.game_over})
+    await client.put("/api/active-players/game-2", json=finished.model_dump(mode="json"), headers=headers)
+    assert players.active_players == []
+    assert hub.latest("game-2") is None
+
+    # Explicit removal
+    player = make_player(player_id="game-3")
+    await client.put("/api/active-players/game-3", json=player.model_dump(mode="json"), headers=headers)
+    response = await client.delete("/api/active-players/game-3", headers=headers)
+    assert response.status_code == 200
+    assert players.active_players == []
+    assert hub.latest("game-3") is None
+
+@pytest.mark.asyncio
+async def test_stale_players_expire(client, clean_players):
+    headers = await login(client)
+    player = make_player(player_id="idle-game")
+    await client.put("/api/active-players/idle-game", json=player.model_dump(mode="json"), headers=headers)
+
+    players.prune_stale_players(now=players.last_seen["idle-game"] + players.ACTIVE_PLAYER_TTL_SECONDS + 1)
+    assert players.active_players == []
+    assert hub.latest("idle-game") is None
+
+def test_watch_websocket_receives_latest_state(clean_players):
+    player = make_player(score=70, player_id="ws-player")
+    hub.publish(player)
+    test_client = TestClient(app)
+    with test_client.websocket_connect("/api/active-players/ws-player/watch") as websocket:
+        assert websocket.receive_bytes() == player.model_dump_json().encode()
+    assert hub.viewer_count("ws-player") == 0
+
+def test_watch_websocket_closed_when_player_removed(clean_players):
+    hub.publish(make_player(player_id="ws-player"))
+    test_client = TestClient(app)
+    with test_client.websocket_connect("/api/active-players/ws-player/watch") as websocket:
+        websocket.receive_bytes()
+        # Run the removal on the app's event loop, as a request handler would
+        websocket.portal.call(players.remove_active_player, "ws-player")
+        assert websocket.receive()["type"] == "websocket.close"
+    assert hub.viewer_count("ws-player") == 0
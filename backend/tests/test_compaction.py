@@ -0,0 +1,55 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select
+
+from app.compaction import archive_batch, compact_leaderboard, decompress_entries, find_candidates
+from app.models import LeaderboardEntry, LeaderboardArchive, GameMode
+
+@pytest.mark.asyncio
+async def test_compaction_keeps_best_and_recent(db_session):
+    old = datetime.utcnow() - timedelta(days=90)
+    # 5 old entries for Alice in walls, 1 recent low score, 1 old pass-through entry
+    for score in (10, 20, 30, 40, 50):
+        db_session.add(LeaderboardEntry(username="Alice", score=score, mode=GameMode.walls, date=old))
+    db_session.add(LeaderboardEntry(username="Alice", score=1, mode=GameMode.walls, date=datetime.utcnow()))
+    db_session.add(LeaderboardEntry(username="Alice", score=5, mode=GameMode.pass_through, date=old))
+    db_session.add(LeaderboardEntry(username="Bob", score=45, mode=GameMode.walls, date=old))
+    await db_session.commit()
+
+    archived = await compact_leaderboard(db_session, keep_best=2, recent_days=30, batch_size=2, pause=0, users_per_page=1)
+    assert archived == 3
+
+    result = await db_session.execute(select(LeaderboardEntry))
+    remaining = sorted((e.username, e.mode, e.score) for e in result.scalars().all())
+    assert remaining == [
+        ("Alice", GameMode.pass_through, 5),
+        ("Alice", GameMode.walls, 1),
+        ("Alice", GameMode.walls, 40),
+        ("Alice", GameMode.walls, 50),
+        ("Bob", GameMode.walls, 45),
+    ]
+
+    result = await db_session.execute(select(LeaderboardArchive))
+    archives = result.scalars().all()
+    assert sum(a.entryCount for a in archives) == 3
+    archived_scores = sorted(row["score"] for a in archives for row in decompress_entries(a))
+    assert archived_scores == [10, 20, 30]
+
+    # Running again is a no-op
+    assert await compact_leaderboard(db_session, keep_best=2, recent_days=30, batch_size=2, pause=0) == 0
+
+@pytest.mark.asyncio
+async def test_overlapping_runs_archive_each_entry_once(db_session):
+    old = datetime.utcnow() - timedelta(days=90)
+    for score in (10, 20, 30):
+        db_session.add(LeaderboardEntry(username="Alice", score=score, mode=GameMode.walls, date=old))
+    await db_session.commit()
+
+    # Two runs that picked the same candidates: the second finds nothing left to archive
+    ids = await find_candidates(db_session, ["Alice"], keep_best=1, cutoff=datetime.utcnow(), limit=10)
+    assert len(ids) == 2
+    assert await archive_batch(db_session, ids) == 2
+    assert await archive_batch(db_session, ids) == 0
+
+    result = await db_session.execute(select(LeaderboardArchive))
+    assert sum(a.entryCount for a in result.scalars().all()) == 2
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db import Base
+from app import migrations
+from app.migrations import LATEST_VERSION, MIGRATIONS, current_version, run_migrations
+from app.models import User
+
+@pytest.mark.asyncio
+async def test_migrations_apply_once(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'migrate.db'}")
+    try:
+        assert await run_migrations(engine) == len(MIGRATIONS)
+        assert await current_version(engine) == LATEST_VERSION
+        # Already up to date
+        assert await run_migrations(engine) == 0
+
+        async with engine.connect() as conn:
+            tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+        assert {"users", "leaderboard", "leaderboard_archive", "schema_version"} <= set(tables)
+    finally:
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_migrations_adopt_existing_schema(tmp_path):
+    # Databases created by the old create_all startup have tables but no version row
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[User.__table__])
+        assert await run_migrations(engine) == len(MIGRATIONS)
+        assert await current_version(engine) == LATEST_VERSION
+
+        async with engine.connect() as conn:
+            indexes = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_indexes("leaderboard"))
+        assert "ix_leaderboard_username_mode_score" in {index["name"] for index in indexes}
+    finally:
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_migrations_tolerate_concurrent_runner(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'race.db'}")
+    try:
+        await run_migrations(engine)
+
+        # Simulate a worker that read the version before another one finished
+        real_current_version = migrations.current_version
+        reads = []
+
+        async def stale_then_real(db_engine):
+            reads.append(db_engine)
+            return 0 if len(reads) == 1 else await real_current_version(db_engine)
+
+        monkeypatch.setattr(migrations, "current_version", stale_then_real)
+        assert await run_migrations(engine) == 0
+        assert await real_current_version(engine) == LATEST_VERSION
+    finally:
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_migrated_schema_matches_models(tmp_path):
+    # Migrations declare frozen DDL; the latest version must still line up with models.py
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'schema.db'}")
+    try:
+        await run_migrations(engine)
+
+        def describe(sync_conn):
+            inspector = inspect(sync_conn)
+            return {
+                table: (
+                    {column["name"] for column in inspector.get_columns(table)},
+                    {index["name"] for index in inspector.get_indexes(table)},
+                )
+                for table in Base.metadata.tables
+            }
+
+        async with engine.connect() as conn:
+            migrated = await conn.run_sync(describe)
+
+        for name, table in Base.metadata.tables.items():
+            columns, indexes = migrated[name]
+            assert columns == {column.name for column in table.columns}, name
+            assert indexes == {index.name for index in table.indexes}, name
+    finally:
+        await engine.dispose()
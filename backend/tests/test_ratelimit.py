@@ -0,0 +1,157 @@
+import asyncio
+import re
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from app import ratelimit
+from app.db import get_db
+from app.main import app
+from app.ratelimit import (
+    ConcurrencyLimiter,
+    RateLimiter,
+    auth_limiter,
+    publish_limiter,
+    reset_rate_limits,
+    score_limiter,
+)
+from app.routers import players
+
+def test_token_bucket_refills_and_evicts_idle_keys():
+    limiter = RateLimiter(rate=1.0, burst=2, idle_seconds=60)
+    assert limiter.acquire("a", now=0) == 0
+    assert limiter.acquire("a", now=0) == 0
+    # Bucket empty: retry after one token refills
+    assert limiter.acquire("a", now=0) == pytest.approx(1.0)
+    assert limiter.acquire("a", now=1.5) == 0
+
+    limiter.acquire("b", now=30)
+    assert len(limiter) == 2
+    # "a" was last used at 1.5, so it is idle by now; "b" is not
+    limiter.acquire("b", now=70)
+    assert len(limiter) == 1
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_sheds_load():
+    limiter = ConcurrencyLimiter(limit=1, max_queued=1, timeout=0.05)
+    assert await limiter.acquire() is True
+
+    # One waiter may queue, but times out while the slot is held
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    # Queue is full, so this is rejected immediately
+    assert await limiter.acquire() is False
+    assert await waiter is False
+
+    limiter.release()
+    assert await limiter.acquire() is True
+
+@pytest.mark.asyncio
+async def test_submit_score_rate_limited(client):
+    await client.post("/api/auth/signup", json={"email": "looper@test.com", "username": "Looper", "password": "pw"})
+    login_res = await client.post("/api/auth/login", json={"email": "looper@test.com", "password": "pw"})
+    headers = {"Authorization": f"Bearer {login_res.json()['token']}"}
+
+    for _ in range(score_limiter.burst):
+        response = await client.post("/api/leaderboard", json={"score": 1, "mode": "walls"}, headers=headers)
+        assert response.status_code == 201
+
+    response = await client.post("/api/leaderboard", json={"score": 1, "mode": "walls"}, headers=headers)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+def shipped_forwarded_allow_ips(filename):
+    text = (REPO_ROOT / filename).read_text()
+    if filename == "render.yaml":
+        match = re.search(r"key: FORWARDED_ALLOW_IPS\s+value: (\S+)", text)
+    else:
+        match = re.search(r"ENV FORWARDED_ALLOW_IPS=(\S+)", text)
+    assert match, f"FORWARDED_ALLOW_IPS not set in {filename}"
+    return match.group(1)
+
+async def login_statuses(db_session, trusted_hosts, peer, forwarded_for):
+    async def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    reset_rate_limits()
+    # Same stack uvicorn builds: proxy headers are only trusted from FORWARDED_ALLOW_IPS
+    proxied = ProxyHeadersMiddleware(app, trusted_hosts=trusted_hosts)
+    statuses = []
+    try:
+        async with AsyncClient(transport=ASGITransport(app=proxied, client=(peer, 4000)), base_url="http://test") as c:
+            for header in forwarded_for:
+                response = await c.post(
+                    "/api/auth/login",
+                    json={"email": "nobody@test.com", "password": "pw"},
+                    headers={"X-Forwarded-For": header},
+                )
+                statuses.append(response.status_code)
+    finally:
+        app.dependency_overrides.clear()
+    return statuses
+
+@pytest.mark.asyncio
+async def test_spoofed_forwarded_for_does_not_change_rate_limit_key(db_session):
+    # Image default, client talking to the container directly: the header is ignored
+    trusted = shipped_forwarded_allow_ips("Dockerfile")
+    spoofed = [f"198.51.100.{i}" for i in range(auth_limiter.burst + 1)]
+    statuses = await login_statuses(db_session, trusted, "203.0.113.7", spoofed)
+    assert statuses[-1] == 429
+
+@pytest.mark.asyncio
+async def test_render_config_keys_on_real_client_ip(db_session):
+    trusted = shipped_forwarded_allow_ips("render.yaml")
+    render_proxy = "10.20.30.40"
+
+    # Distinct clients behind Render's proxy get separate buckets, not one shared one
+    clients = [f"203.0.113.{i}" for i in range(auth_limiter.burst * 2)]
+    statuses = await login_statuses(db_session, trusted, render_proxy, clients)
+    assert 429 not in statuses
+
+    # A client prepending spoofed hops still lands in its own bucket: the proxy
+    # appends the real address, and that is what uvicorn picks
+    spoofed = [f"198.51.100.{i}, 203.0.113.9" for i in range(auth_limiter.burst + 1)]
+    statuses = await login_statuses(db_session, trusted, render_proxy, spoofed)
+    assert statuses[-1] == 429
+
+def test_reset_rebinds_concurrency_limiter():
+    async def contend():
+        limiter = ratelimit.concurrency_limiter
+        limiter.timeout = 0.01
+        for _ in range(limiter.limit):
+            assert await limiter.acquire() is True
+        # Waiting binds the semaphore to this event loop
+        assert await limiter.acquire() is False
+        for _ in range(limiter.limit):
+            limiter.release()
+
+    reset_rate_limits()
+    asyncio.run(contend())
+    # A later test on a fresh event loop must not hit "bound to a different event loop"
+    reset_rate_limits()
+    asyncio.run(contend())
+
+@pytest.mark.asyncio
+async def test_publish_rate_limited_per_user(client, monkeypatch):
+    monkeypatch.setattr(publish_limiter, "burst", 2)
+    await client.post("/api/auth/signup", json={"email": "fast@test.com", "username": "Fast", "password": "pw"})
+    login_res = await client.post("/api/auth/login", json={"email": "fast@test.com", "password": "pw"})
+    headers = {"Authorization": f"Bearer {login_res.json()['token']}"}
+
+    body = {
+        "id": "fast-game", "username": "Fast", "score": 0, "mode": "walls",
+        "snake": [{"x": 1, "y": 1}], "food": {"x": 2, "y": 2}, "direction": "UP", "status": "playing",
+    }
+    try:
+        statuses = [
+            (await client.put("/api/active-players/fast-game", json=body, headers=headers)).status_code
+            for _ in range(3)
+        ]
+    finally:
+        players.remove_active_player("fast-game")
+    assert statuses == [200, 200, 429]
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Cold start budget: fresh interpreter, app import, startup, first health check.
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "5"))
+
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+with TestClient(app) as client:
+    response = client.get("/api/health")
+    assert response.status_code == 200, response.text
+print(time.perf_counter() - start)
+"""
+
+@pytest.mark.parametrize("schema_mode", ["auto", "skip"])
+def test_cold_start_within_budget(tmp_path, schema_mode):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'startup.db'}",
+        SCHEMA_MIGRATIONS=schema_mode,
+        LEADERBOARD_COMPACTION_INTERVAL="0",
+    )
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=backend_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    elapsed = float(result.stdout.strip().splitlines()[-1])
+    assert elapsed < STARTUP_BUDGET_SECONDS, f"cold start took {elapsed:.2f}s"